@@ -0,0 +1,79 @@
+import numpy as np
+
+def rollout_batch(agent, environment, positions: list, max_timesteps: int):
+    """Rolls out deterministic episodes for a batch of start positions in lockstep.
+
+    All active episodes are passed to the agent in one call per timestep (independent mode batches over the
+    leading axis of the states). A single environment is used for all episodes by switching its state with
+    set_state before every step.
+
+    Args:
+        agent (Agent): Tensorforce agent
+        environment (DungeonTFEnvironment): the environment
+        positions (list[Position]): start positions
+        max_timesteps (int): maximum number of steps per episode
+
+    Returns:
+        array[bool], array[int]: whether each episode reached a terminal state and the number of steps taken
+    """
+    num_episodes = len(positions)
+    positions = list(positions)
+    steps = np.zeros(num_episodes, dtype=np.int32)
+    success = np.zeros(num_episodes, dtype=bool)
+    active = np.arange(num_episodes)
+    internals = _batch_internals(agent.initial_internals(), num_episodes)
+
+    # Preallocated batch arrays, filled row by row for the active episodes
+    states = None
+
+    for _ in range(max_timesteps):
+        if len(active) == 0:
+            break
+
+        for row, episode in enumerate(active):
+            observation = environment.set_state(positions[episode])
+            if states is None:
+                states = {
+                    name: np.empty((num_episodes,) + np.shape(value), dtype=np.asarray(value).dtype)
+                    for name, value in observation.items()
+                }
+            for name, value in observation.items():
+                states[name][row] = value
+
+        actions, next_internals = agent.act(
+            states={name: value[:len(active)] for name, value in states.items()},
+            internals=_select_internals(internals, active),
+            independent=True, deterministic=True
+        )
+        _update_internals(internals, active, next_internals)
+
+        still_active = []
+        for episode, action in zip(active, actions):
+            environment.set_state(positions[episode])
+            _, terminal, _ = environment.execute(int(action))
+            positions[episode] = environment.get_state()
+            steps[episode] += 1
+            if terminal:
+                success[episode] = True
+            else:
+                still_active.append(episode)
+        active = np.array(still_active, dtype=np.int64)
+
+    return success, steps
+
+def _batch_internals(internals, num_episodes: int):
+    if isinstance(internals, dict):
+        return {name: _batch_internals(value, num_episodes) for name, value in internals.items()}
+    return np.stack([np.asarray(internals)] * num_episodes)
+
+def _select_internals(internals, active):
+    if isinstance(internals, dict):
+        return {name: _select_internals(value, active) for name, value in internals.items()}
+    return internals[active]
+
+def _update_internals(internals, active, next_internals):
+    for name, value in internals.items():
+        if isinstance(value, dict):
+            _update_internals(value, active, next_internals[name])
+        else:
+            value[active] = next_internals[name]
@@ -0,0 +1,30 @@
+from collections import deque
+from Position import Position
+
+def compute_distance_field(accessible_positions, source: Position, step_size: int = 1):
+    """Computes the shortest path lengths (in steps) from a source position to all reachable positions.
+
+    Uses a breadth first search over the four movement directions of the environments.
+
+    Args:
+        accessible_positions (SparseLevel | set[Position]): accessible tiles (must support "in" queries)
+        source (Position): source position, e.g. the goal
+        step_size (int, optional): distance covered by one step. Defaults to 1.
+
+    Returns:
+        dict[Position, int]: number of steps for every position reachable from the source
+    """
+    distances = {source: 0}
+    queue = deque([source])
+    offsets = [(0, step_size), (0, -step_size), (-step_size, 0), (step_size, 0)]
+
+    while queue:
+        position = queue.popleft()
+        distance = distances[position] + 1
+        for dx, dy in offsets:
+            neighbor = position.moved(dx, dy)
+            if neighbor not in distances and neighbor in accessible_positions:
+                distances[neighbor] = distance
+                queue.append(neighbor)
+
+    return distances
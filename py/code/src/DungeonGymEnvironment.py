@@ -1,17 +1,24 @@
 import gym
 import random
 import numpy as np
-from JavaDungeon import Point, Level
+from JavaDungeon import Level, get_sparse_level
+from Position import Position, position_as_array
+from SparseLevel import SparseLevel
+from Rewards import compile_rewards, compile_termination, DEFAULT_REWARDS
 
 class DungeonGymEnvironment(gym.Env):
     """An OpenAI Gym compatible environment for navigating in a dungeon with RF learning
     """
-    def __init__(self, dungeon: Level, n_actions: int):
+
+    def __init__(self, dungeon: Level, n_actions: int, rewards: list = None, seed: int = None):
         """Initialize the environment
 
         Args:
             dungeon (Level): the dungeon
             n_actions (int): number of possible actions
+            rewards (list[dict], optional): reward declarations (see Rewards.compile_rewards).
+                Defaults to a reward of 1 for reaching the goal.
+            seed (int, optional): seed of the random number generator of this environment. Defaults to None.
 
         Raises:
             ValueError: raised if given number of actions is invalid (<1)
@@ -20,19 +27,22 @@ class DungeonGymEnvironment(gym.Env):
             raise ValueError('Number of action cannot be less than 1. Given value %d' % (n_actions))
 
         super(DungeonGymEnvironment, self).__init__()
+        self._random           = random.Random(seed)
         self.dungeon           = dungeon
+        self.level             = get_sparse_level(dungeon)
         self.action_space      = gym.spaces.Discrete(n_actions)
-        self.observation_space = self._getObservationSpace(dungeon)
-        self.goal              = dungeon.getEndTile().getGlobalPosition().toPoint()
-        self.start_tiles       = [
-            tile
-            for room in dungeon.getRooms()
-            for sub_list in room.getLayout()
-            for tile in sub_list
-            if tile.isAccessible() and not tile.getGlobalPosition().equals(self.goal.toCoordinate())
-        ]
-        self.position          = random.choice(self.start_tiles).getGlobalPosition().toPoint()
+        self.observation_space = self._getObservationSpace(self.level)
+        self.goal              = Position.from_point(dungeon.getEndTile().getGlobalPosition())
+        self.position          = self.level.random_position(self._random, exclude=[self.goal])
         self.step_size         = 1
+        self.action_masking    = True
+
+        # Reward and termination
+        goal = position_as_array(self.goal)
+        self._reward   = compile_rewards(DEFAULT_REWARDS if rewards is None else rewards, goal)
+        self._terminal = compile_termination(goal)
+        self._current_state_buffer = np.empty(2, dtype=np.int32)
+        self._next_state_buffer    = np.empty(2, dtype=np.int32)
  
     def reset(self):
         """Reset the environment
@@ -42,9 +52,9 @@ class DungeonGymEnvironment(gym.Env):
             np.array: initial state after reset
         """
         # Choose random tile (must be accessible and not be the goal tile)
-        self.position = random.choice(self.start_tiles).getGlobalPosition().toPoint()
+        self.position = self.level.random_position(self._random, exclude=[self.goal])
 
-        return np.array([self.position.x, self.position.y]).astype(np.float32)
+        return self._observation()
  
     def step(self, action):
         """Perform an action in the environment
@@ -73,36 +83,73 @@ class DungeonGymEnvironment(gym.Env):
             dx = self.step_size
 
         # Calculate new position
-        new_position = Point(self.position.x + dx, self.position.y + dy)
+        current_state = position_as_array(self.position, out=self._current_state_buffer)
+        new_position = self.position.moved(dx, dy)
 
         # Perform movement if new position is accessible
-        if (self.dungeon.getTileAt(new_position.toCoordinate()).isAccessible()):
+        if new_position in self.level:
             self.position = new_position
+        next_state = position_as_array(self.position, out=self._next_state_buffer)
 
-        # Check if goal position has been reached
-        done = self.position.toCoordinate().equals(self.goal.toCoordinate())
-
-        # Null reward everywhere except when reaching the goal
-        reward = 1 if done else 0
+        # Check if goal position has been reached and compute reward
+        done = bool(self._terminal(current_state, action, next_state))
+        reward = float(self._reward(current_state, action, next_state))
 
         # Optionally we can pass additional info, we are not using that for now
         info = {}
 
-        # returned observation must be a numpy array
-        observation = np.array([self.position.x, self.position.y]).astype(np.float32)
+        return self._observation(), reward, done, info
+
+    def seed(self, seed=None):
+        """Reseed the random number generator of the environment
+
+        Args:
+            seed (int, optional): the seed. Defaults to None.
+
+        Returns:
+            list[int]: list containing the seed
+        """
+        self._random.seed(seed)
+        return [seed]
+
+    def action_masks(self):
+        """Returns array of possible actions (used by maskable algorithms of sb3-contrib)
 
-        return observation, reward, done, info
+        Returns:
+            np.array[bool]: Array of booleans indicating which actions lead to an accessible tile. Actions
+            other than the four movements are always possible. If action masking is disabled all values are true.
+        """
+        mask = np.ones(self.action_space.n, dtype=bool)
+        if not self.action_masking:
+            return mask
+
+        x, y = self.position.x, self.position.y
+        moves = [(0, self.step_size), (0, -self.step_size), (-self.step_size, 0), (self.step_size, 0)]
+        for action, (dx, dy) in enumerate(moves[:self.action_space.n]):
+            mask[action] = self.level.is_accessible(x + dx, y + dy)
+        return mask
 
-    def _getObservationSpace(self, dungeon: Level):
-        """Calculate the observation space for a given dungeon object
+    def disable_action_masking(self):
+        """Disables action masking"""
+        self.action_masking = False
+
+    def _observation(self):
+        """Returns the observation for the current position. A new array is created on every call since
+        vectorized Gym environments keep references to terminal observations across resets.
+
+        Returns:
+            np.array: x,y coordinates of the current position
+        """
+        return np.array([self.position.x, self.position.y], dtype=np.float32)
+
+    def _getObservationSpace(self, level: SparseLevel):
+        """Calculate the observation space for a given dungeon
 
         Args:
-            dungeon (Level): the dungeon
+            level (SparseLevel): accessibility map of the dungeon
 
         Returns:
             gym.space: bounded state space
         """
-        tiles = [tile for room in dungeon.getRooms() for sub_list in room.getLayout() for tile in sub_list]
-        positions = [(p.x, p.y) for p in [tile.getGlobalPosition().toPoint() for tile in tiles]]
-        limits =  np.array(list(map(min, zip(*positions)))), np.array(list(map(max, zip(*positions))))
-        return gym.spaces.Box(limits[0], limits[1])
+        x_min, y_min, x_max, y_max = level.bounds()
+        return gym.spaces.Box(np.array([x_min, y_min], np.float32), np.array([x_max, y_max], np.float32))
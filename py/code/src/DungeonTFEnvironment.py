@@ -2,35 +2,53 @@ import random
 import numpy as np
 from tensorforce import Environment
 from JavaDungeon import Point, Level
-from JavaDungeon import is_position_accessible, get_accessible_coordinates, get_dungeon_bounds
+from JavaDungeon import get_sparse_level
+from Position import Position, position_as_array
+from SparseLevel import SparseLevel
+from Rewards import compile_rewards, compile_termination, DEFAULT_REWARDS
 
 class DungeonTFEnvironment(Environment):
     """An RF learning environment based on the Tensorforce environment interface. Similar to DungeonGymEnvironment
     but extended with action masking.
     """
-    def __init__(self, dungeon: Level):
+
+    def __init__(self, dungeon: Level, rewards: list = None, seed: int = None):
         """Initialize the environment
 
         Args:
             dungeon (Level): the dungeon
+            rewards (list[dict], optional): reward declarations (see Rewards.compile_rewards).
+                Defaults to a reward of 1 for reaching the goal.
+            seed (int, optional): seed of the random number generator of this environment. Defaults to None.
         """
         super().__init__()
 
+        # Random number generator
+        self._random = random.Random(seed)
+
         # Dungeon level (java class)
         self.dungeon = dungeon
 
+        # Accessibility map
+        self.level = get_sparse_level(dungeon)
+
         # State space
         state_indices = [0, 1]
         self._state_indices = np.array(state_indices, np.int32)
-        self._state_bounds = self.get_state_bounds(dungeon)
+        self._state_bounds = self.get_state_bounds(self.level)
 
         # Start/Goal
         self.goal_coordinate = dungeon.getEndTile().getGlobalPosition()
-        self.start_positions = [
-            coordinate.toPoint()
-            for coordinate in get_accessible_coordinates(self.dungeon)
-            if not coordinate.equals(self.goal_coordinate)
-        ]
+        self.goal = Position.from_point(self.goal_coordinate)
+
+        # Reward and termination
+        goal = position_as_array(self.goal)
+        self._reward = compile_rewards(DEFAULT_REWARDS if rewards is None else rewards, goal)
+        self._terminal = compile_termination(goal)
+
+        # Buffers for reward evaluation
+        self._current_state_buffer = np.empty(2, dtype=np.int32)
+        self._next_state_buffer = np.empty(2, dtype=np.int32)
 
         # Step size
         self.step_size = 1
@@ -69,7 +87,8 @@ class DungeonTFEnvironment(Environment):
             dict[state, action_mask]: Dictionary containing initial state(s) and action mask. See "get_action_mask" method
             for meaning of the mask.
         """
-        self._internal_state = random.choice(self.start_positions)
+        # Choose random tile (must be accessible and not be the goal tile)
+        self._internal_state = self.level.random_position(self._random, exclude=[self.goal])
         return dict(state=self.get_external_state(), action_mask=self.get_action_mask())
 
 
@@ -85,28 +104,28 @@ class DungeonTFEnvironment(Environment):
             aborted and observed reward.
         """
         # Compute next state and associated action mask
+        current_state = position_as_array(self._internal_state, out=self._current_state_buffer)
         self._internal_state = self.get_next_state(actions)
+        next_state = position_as_array(self._internal_state, out=self._next_state_buffer)
         states = dict(state=self.get_external_state(), action_mask=self.get_action_mask())
-        
-        # Compute terminal
-        terminal = Point(self._internal_state.x, self._internal_state.y).toCoordinate().equals(self.goal_coordinate)
-        
-        # Compute reward
-        reward = 1 if terminal else 0
+
+        # Compute terminal and reward
+        terminal = bool(self._terminal(current_state, actions, next_state))
+        reward = float(self._reward(current_state, actions, next_state))
 
         return states, terminal, reward
 
 
-    def get_state_bounds(self, dungeon: Level):
+    def get_state_bounds(self, level: SparseLevel):
         """Returns the boundaries of the state space
 
         Args:
-            dungeon (Level): the dungeon
+            level (SparseLevel): accessibility map of the dungeon
 
         Returns:
             array[[x_min, y_min],[x_max, y_max]]: Array containing minimum and maximum values of the 2D state space.
         """
-        x_min, y_min, x_max, y_max = get_dungeon_bounds(dungeon)
+        x_min, y_min, x_max, y_max = level.bounds()
         return np.array([[x_min, y_min],[x_max, y_max]])
 
 
@@ -120,32 +139,45 @@ class DungeonTFEnvironment(Environment):
         if not self.action_masking:
             return np.full(self.actions()['num_values'], True)
 
-        step_north = Point(self._internal_state.x, self._internal_state.y + self.step_size)
-        step_south = Point(self._internal_state.x, self._internal_state.y - self.step_size)
-        step_east  = Point(self._internal_state.x + self.step_size, self._internal_state.y)
-        step_west  = Point(self._internal_state.x - self.step_size, self._internal_state.y)
-
-        return np.asarray([
-            is_position_accessible(self.dungeon, step_north), is_position_accessible(self.dungeon, step_south),
-            is_position_accessible(self.dungeon, step_west), is_position_accessible(self.dungeon, step_east),
+        x, y = self._internal_state.x, self._internal_state.y
+        return np.array([
+            self.level.is_accessible(x, y + self.step_size), self.level.is_accessible(x, y - self.step_size),
+            self.level.is_accessible(x - self.step_size, y), self.level.is_accessible(x + self.step_size, y),
         ])
 
-    def set_state(self, state: Point):
+    def set_state(self, state: Point | Position):
         """Sets the current state of the environment if given a valid state parameter (i.e. a reachable state).
 
         Args:
-            state (Point): The desired new state of the environment.
+            state (Point | Position): The desired new state of the environment.
 
         Returns:
             dict[state, action_mask], bool | 0 | 1 | 2, float: Dictionary containing next state(s)
             and action mask, whether a terminal state is reached or 2 if the episode was
             aborted and observed reward.
         """
-        if is_position_accessible(self.dungeon, state):
-            self._internal_state = state
+        position = Position.from_point(state)
+        if position in self.level:
+            self._internal_state = position
 
         return dict(state=self.get_external_state(), action_mask=self.get_action_mask())
 
+    def seed(self, seed: int = None):
+        """Reseeds the random number generator of the environment.
+
+        Args:
+            seed (int, optional): The seed. Defaults to None.
+        """
+        self._random.seed(seed)
+
+    def get_state(self):
+        """Returns the current state of the environment.
+
+        Returns:
+            Position: The current position.
+        """
+        return self._internal_state
+
     def disable_action_masking(self):
         """Disables action masking"""
         self.action_masking = False
@@ -157,19 +189,20 @@ class DungeonTFEnvironment(Environment):
             action (int): Action taken by the agent
 
         Returns:
-            np.array: next state
+            Position: next state
         """
-        next_state = Point(self._internal_state)
+        dx, dy = 0, 0
         if action == 0:
-            next_state.y += self.step_size
+            dy = self.step_size
         elif action == 1:
-            next_state.y -= self.step_size
+            dy = -self.step_size
         elif action == 2:
-            next_state.x -= self.step_size
+            dx = -self.step_size
         elif action == 3:
-            next_state.x += self.step_size
+            dx = self.step_size
 
-        if self.action_masking or is_position_accessible(self.dungeon, next_state):
+        next_state = self._internal_state.moved(dx, dy)
+        if self.action_masking or next_state in self.level:
             return next_state
 
         return self._internal_state
@@ -180,4 +213,4 @@ class DungeonTFEnvironment(Environment):
         Returns:
             array: Array of state variables
         """
-        return np.array([self._internal_state.x, self._internal_state.y]).astype(np.float32)
+        return np.array([self._internal_state.x, self._internal_state.y], dtype=np.float32)
@@ -0,0 +1,276 @@
+import argparse
+import csv
+import json
+import multiprocessing
+import numpy as np
+from collections import defaultdict
+from glob import glob
+from os import cpu_count
+from os.path import isdir, join, abspath
+from time import perf_counter
+
+from tensorforce.environments import Environment
+from tensorforce.agents import Agent
+from JavaDungeon import LevelLoader
+from DungeonTFEnvironment import DungeonTFEnvironment
+from DistanceField import compute_distance_field
+from BatchRollout import rollout_batch
+from Seeding import derive_seed, ENVIRONMENT_STREAM
+from TrainModel import checkPositive
+
+# Per worker process state (see initializeWorker)
+_worker = {}
+
+def setupArgumentParser():
+    """Configure a command line argument parser.
+
+    Returns:
+        ArgumentParser: A command line argument parser.
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-c", "--configuration", help="Training configuration of the model to evaluate")
+    parser.add_argument("-l", "--levels", nargs="+", help="Level files or directories containing level files")
+    parser.add_argument("-o", "--out", default="evaluation", help="Base name of the JSON and CSV result files")
+    parser.add_argument("-w", "--workers", type=checkPositive, default=cpu_count(), help="Number of worker processes")
+    parser.add_argument("-b", "--batch_size", type=checkPositive, default=64, help="Start tiles per task and agent call")
+    parser.add_argument("-m", "--max_timesteps", type=checkPositive, default=None, help="Defaults to training value")
+    return parser
+
+def loadConfigurationFromFile(path):
+    with open(path) as configFile:
+        return json.load(configFile)
+
+def collectLevels(paths):
+    """Expands directories into the level files they contain.
+
+    Args:
+        paths (list[str]): level files or directories
+
+    Returns:
+        list[str]: absolute paths of level files
+    """
+    levels = []
+    for path in paths:
+        if isdir(path):
+            levels.extend(sorted(glob(join(path, "*.json"))))
+        else:
+            levels.append(path)
+    return [abspath(level) for level in levels]
+
+def CreateEnvironment(config, level, rank=0):
+    """Creates an evaluation environment for a level.
+
+    Args:
+        config (dict): training configuration
+        level (str): path of the level file
+        rank (int, optional): index of the environment, used to derive its seed. Defaults to 0.
+
+    Returns:
+        DungeonTFEnvironment: the environment
+    """
+    dungeon = DungeonTFEnvironment(
+        dungeon=LevelLoader().loadLevel(level),
+        rewards=config["environment"].get("rewards"),
+        seed=derive_seed(config["environment"].get("seed"), ENVIRONMENT_STREAM, rank)
+    )
+
+    if config["environment"]["disable_action_masking"]:
+        dungeon.disable_action_masking()
+
+    return dungeon
+
+def fitsStateSpecification(environment, states):
+    """Checks if all accessible positions of a level lie within the state bounds the agent was trained with.
+
+    Args:
+        environment (DungeonTFEnvironment): environment of the level
+        states (dict): state specification of the training level (see DungeonTFEnvironment.states)
+
+    Returns:
+        bool: True if the level fits the state specification else False
+    """
+    x_min, y_min, x_max, y_max = environment.level.bounds()
+    return bool(np.all(states["min_value"] <= [x_min, y_min]) and np.all(states["max_value"] >= [x_max, y_max]))
+
+def initializeWorker(config, max_timesteps, ranks):
+    """Loads the saved model once per worker process.
+
+    Args:
+        config (dict): training configuration
+        max_timesteps (int): maximum number of steps per episode
+        ranks (dict[str, int]): index of every level, used to derive the seeds of the environments
+    """
+    # The agent is created with the specification of the training level
+    environment = Environment.create(
+        environment=CreateEnvironment(config, config["environment"]["dungeon"]),
+        max_episode_timesteps=max_timesteps
+    )
+    _worker["agent"] = Agent.load(
+        directory=join(config["output"], "numpy-model"),
+        format='numpy',
+        environment=environment,
+        agent=config["agent"]
+    )
+    _worker["config"] = config
+    _worker["max_timesteps"] = max_timesteps
+    _worker["levels"] = {}
+    _worker["ranks"] = ranks
+
+def loadLevel(level):
+    """Returns the (cached) environment and distance field of a level in the current worker process.
+
+    Args:
+        level (str): path of the level file
+
+    Returns:
+        DungeonTFEnvironment, dict[Position, int]: environment and steps to the goal for each position
+    """
+    if level not in _worker["levels"]:
+        environment = CreateEnvironment(_worker["config"], level, _worker["ranks"][level])
+        distances = compute_distance_field(environment.level, environment.goal, environment.step_size)
+        _worker["levels"][level] = environment, distances
+    return _worker["levels"][level]
+
+def evaluateStartPositions(task):
+    """Rolls out deterministic episodes for a batch of start positions in lockstep (see rollout_batch).
+
+    Args:
+        task (tuple[str, list[int]]): level path and indices into the accessible positions of the level
+
+    Returns:
+        str, list[dict], float: level path, one record per episode and seconds spent on the rollouts
+    """
+    level, indices = task
+    environment, distances = loadLevel(level)
+    positions = [environment.level.position(index) for index in indices]
+    positions = [position for position in positions if position != environment.goal]
+    start_time = perf_counter()
+
+    success, steps = rollout_batch(_worker["agent"], environment, positions, _worker["max_timesteps"])
+
+    seconds = perf_counter() - start_time
+
+    return level, [
+        dict(
+            level=level,
+            x=position.x,
+            y=position.y,
+            success=bool(episode_success),
+            steps=int(episode_steps),
+            optimal_steps=distances.get(position)
+        )
+        for position, episode_success, episode_steps in zip(positions, success, steps)
+    ], seconds
+
+def summarizeLevel(level, episodes, seconds):
+    """Aggregates the episode records of a level.
+
+    Args:
+        level (str): path of the level file
+        episodes (list[dict]): episode records
+        seconds (float): time spent on the rollouts of the level (summed over worker processes)
+
+    Returns:
+        dict: level metrics
+    """
+    successful = [episode for episode in episodes if episode["success"] and episode["optimal_steps"]]
+    total_steps = sum(episode["steps"] for episode in episodes)
+    return dict(
+        level=level,
+        episodes=len(episodes),
+        reachable=sum(episode["optimal_steps"] is not None for episode in episodes),
+        success_rate=sum(episode["success"] for episode in episodes) / len(episodes),
+        mean_steps=float(np.mean([episode["steps"] for episode in successful])) if successful else None,
+        mean_optimal_steps=float(np.mean([episode["optimal_steps"] for episode in successful])) if successful else None,
+        path_length_ratio=float(np.mean([
+            episode["steps"] / episode["optimal_steps"] for episode in successful
+        ])) if successful else None,
+        total_steps=total_steps,
+        seconds=seconds,
+        steps_per_second=total_steps / seconds if seconds > 0 else None
+    )
+
+def EvaluateLevels(config, levels, workers, batch_size, max_timesteps):
+    """Evaluates a saved model on every start tile of every level using a pool of worker processes.
+
+    Args:
+        config (dict): training configuration
+        levels (list[str]): paths of the level files
+        workers (int): number of worker processes
+        batch_size (int): number of start tiles per task
+        max_timesteps (int): maximum number of steps per episode
+
+    Returns:
+        dict: level metrics, overall throughput and levels skipped because they exceed the training state bounds
+    """
+    # The agent only accepts states within the bounds of the training level
+    states = CreateEnvironment(config, config["environment"]["dungeon"]).states()
+
+    # Accessible positions are enumerated in the same order in every process (the goal is skipped by the workers)
+    tasks = []
+    skipped = []
+    ranks = {level: rank for rank, level in enumerate(levels)}
+    for level in levels:
+        environment = CreateEnvironment(config, level, ranks[level])
+        if not fitsStateSpecification(environment, states):
+            print("Skipping level {}: bounds {} exceed the training state bounds {} to {}".format(
+                level, environment.level.bounds(), states["min_value"].tolist(), states["max_value"].tolist()
+            ))
+            skipped.append(level)
+            continue
+
+        num_positions = len(environment.level)
+        tasks.extend(
+            (level, list(range(start, min(start + batch_size, num_positions))))
+            for start in range(0, num_positions, batch_size)
+        )
+
+    # JVM and TensorFlow state must not be forked
+    context = multiprocessing.get_context("spawn")
+    episodes = defaultdict(list)
+    seconds = defaultdict(float)
+    start_time = perf_counter()
+    with context.Pool(workers, initializer=initializeWorker, initargs=(config, max_timesteps, ranks)) as pool:
+        for level, records, task_seconds in pool.imap_unordered(evaluateStartPositions, tasks):
+            episodes[level].extend(records)
+            seconds[level] += task_seconds
+    wall_time = perf_counter() - start_time
+
+    results = [summarizeLevel(level, episodes[level], seconds[level]) for level in levels if level in episodes]
+    total_steps = sum(result["total_steps"] for result in results)
+    return dict(
+        levels=results,
+        skipped=skipped,
+        total=dict(
+            episodes=sum(result["episodes"] for result in results),
+            success_rate=float(np.mean([result["success_rate"] for result in results])) if results else None,
+            total_steps=total_steps,
+            workers=workers,
+            seconds=wall_time,
+            steps_per_second=total_steps / wall_time
+        )
+    )
+
+def saveResults(results, out):
+    """Saves level metrics as JSON and CSV file.
+
+    Args:
+        results (dict): level metrics, overall throughput and skipped levels (see EvaluateLevels)
+        out (str): base name of the result files
+    """
+    with open(out + ".json", 'w') as jsonFile:
+        json.dump(results, jsonFile, indent=2)
+
+    if results["levels"]:
+        with open(out + ".csv", 'w', newline='') as csvFile:
+            writer = csv.DictWriter(csvFile, fieldnames=list(results["levels"][0].keys()))
+            writer.writeheader()
+            writer.writerows(results["levels"])
+
+if __name__ == '__main__':
+    parser = setupArgumentParser()
+    args = parser.parse_args()
+    config = loadConfigurationFromFile(args.configuration)
+    max_timesteps = args.max_timesteps or config["environment"]["max_timesteps"]
+    results = EvaluateLevels(config, collectLevels(args.levels), args.workers, args.batch_size, max_timesteps)
+    saveResults(results, args.out)
@@ -0,0 +1,230 @@
+import numpy as np
+from multiprocessing import shared_memory
+
+def experience_schema(states: dict, actions: dict):
+    """Derives the record layout of an experience buffer from environment specifications.
+
+    Args:
+        states (dict): state specification as returned by DungeonTFEnvironment.states()
+        actions (dict): action specification as returned by DungeonTFEnvironment.actions()
+
+    Returns:
+        dict[str, tuple[tuple, dtype]]: shape and dtype of every field of a single record
+    """
+    state_dtype = np.float32 if states["type"] is float else np.int32
+    return dict(
+        state=(tuple(states["shape"]), state_dtype),
+        action_mask=((actions["num_values"],), np.bool_),
+        action=((), np.int32),
+        reward=((), np.float32),
+        terminal=((), np.int8),
+    )
+
+class SharedExperienceBuffer:
+    """A ring buffer for experience records in shared memory.
+
+    Every worker process owns one slot (a ring of fixed capacity) and is the only writer of that slot, so no
+    locking is required. The learner reads contiguous ranges of records as NumPy views without copying, either
+    per worker (batch) or across all workers at once (batch_all).
+    Progress is tracked by two counters per slot: the number of records written by the worker and the number
+    of records released by the learner. A worker cannot overwrite records that have not been released yet.
+
+    The buffer is passed to worker processes as a regular argument, pickling only transfers the name of the
+    shared memory block. The creating process is responsible for calling unlink().
+    """
+
+    def __init__(self, schema: dict, num_workers: int, capacity: int, name: str = None):
+        """Create a new shared memory buffer or attach to an existing one.
+
+        Args:
+            schema (dict[str, tuple[tuple, dtype]]): shape and dtype of every record field (see experience_schema)
+            num_workers (int): number of slots (one per worker process)
+            capacity (int): number of records per slot
+            name (str, optional): name of an existing shared memory block to attach to. Defaults to None
+                (create a new block).
+
+        Raises:
+            ValueError: raised if number of workers or capacity is invalid (<1)
+        """
+        if num_workers <= 0 or capacity <= 0:
+            raise ValueError('Number of workers and capacity must be positive. Given values %d, %d' % (num_workers, capacity))
+
+        self.schema = {field: (tuple(shape), np.dtype(dtype)) for field, (shape, dtype) in schema.items()}
+        self.num_workers = num_workers
+        self.capacity = capacity
+
+        # Layout: written counters, released counters, then one [num_workers, capacity, *shape] array per field
+        layout = [("written", (num_workers,), np.dtype(np.int64)), ("released", (num_workers,), np.dtype(np.int64))]
+        layout += [(field, (num_workers, capacity) + shape, dtype) for field, (shape, dtype) in self.schema.items()]
+
+        offsets, size = [], 0
+        for _, shape, dtype in layout:
+            size += -size % dtype.alignment
+            offsets.append(size)
+            size += int(np.prod(shape, dtype=np.int64)) * dtype.itemsize
+
+        self._owner = name is None
+        if self._owner:
+            self._memory = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        else:
+            self._memory = shared_memory.SharedMemory(name=name)
+
+        self._arrays = {
+            field: np.ndarray(shape, dtype=dtype, buffer=self._memory.buf, offset=offset)
+            for (field, shape, dtype), offset in zip(layout, offsets)
+        }
+        self._written = self._arrays.pop("written")
+        self._released = self._arrays.pop("released")
+
+        if self._owner:
+            self._written.fill(0)
+            self._released.fill(0)
+
+    @classmethod
+    def for_environment(cls, environment, num_workers: int, capacity: int):
+        """Create a buffer with the record layout of an environment.
+
+        Args:
+            environment (DungeonTFEnvironment): environment providing states() and actions()
+            num_workers (int): number of slots (one per worker process)
+            capacity (int): number of records per slot
+
+        Returns:
+            SharedExperienceBuffer: the buffer
+        """
+        return cls(experience_schema(environment.states(), environment.actions()), num_workers, capacity)
+
+    @property
+    def name(self):
+        """Name of the shared memory block"""
+        return self._memory.name
+
+    def __reduce__(self):
+        # Other processes attach to the existing block instead of copying the data
+        schema = {field: (shape, dtype.str) for field, (shape, dtype) in self.schema.items()}
+        return (SharedExperienceBuffer, (schema, self.num_workers, self.capacity, self.name))
+
+    def written(self, worker: int):
+        """Returns the total number of records written to a slot
+
+        Args:
+            worker (int): slot index
+
+        Returns:
+            int: number of records
+        """
+        return int(self._written[worker])
+
+    def space(self, worker: int):
+        """Returns the number of records that can be written to a slot without overwriting unreleased records
+
+        Args:
+            worker (int): slot index
+
+        Returns:
+            int: number of records
+        """
+        return self.capacity - int(self._written[worker] - self._released[worker])
+
+    def write(self, worker: int, **record):
+        """Appends a record to the slot of a worker. Must only be called by the process owning the slot.
+
+        Args:
+            worker (int): slot index
+            **record: values for all fields of the schema
+
+        Raises:
+            BufferError: raised if the slot is full (see space)
+        """
+        if self.space(worker) <= 0:
+            raise BufferError('Slot %d is full, the learner has not released any records' % (worker))
+
+        index = int(self._written[worker]) % self.capacity
+        for field, array in self._arrays.items():
+            array[worker, index] = record[field]
+
+        # Publish the record only after all fields are written
+        self._written[worker] += 1
+
+    def batch(self, worker: int, start: int, size: int):
+        """Returns records [start, start + size) of a slot as NumPy views (no copy).
+
+        The views stay valid until the records are released. Batches must not wrap around the end of the ring,
+        which is guaranteed if the capacity is a multiple of the batch size and batches are read in order.
+
+        Args:
+            worker (int): slot index
+            start (int): index of the first record (counted from the first record ever written)
+            size (int): number of records
+
+        Raises:
+            ValueError: raised if the records are not available or wrap around the end of the ring
+
+        Returns:
+            dict[str, array]: views of shape [size, *shape] for every field
+        """
+        index = self._ring_index(worker, start, size)
+        return {field: array[worker, index:index + size] for field, array in self._arrays.items()}
+
+    def batch_all(self, start: int, size: int):
+        """Returns records [start, start + size) of all slots as NumPy views (no copy), i.e. one batch of
+        size * num_workers records collected in lockstep. Same conditions as for batch() apply to every slot.
+
+        Args:
+            start (int): index of the first record (counted from the first record ever written)
+            size (int): number of records per slot
+
+        Raises:
+            ValueError: raised if the records of any slot are not available or wrap around the end of the ring
+
+        Returns:
+            dict[str, array]: views of shape [num_workers, size, *shape] for every field
+        """
+        for worker in range(self.num_workers):
+            index = self._ring_index(worker, start, size)
+        return {field: array[:, index:index + size] for field, array in self._arrays.items()}
+
+    def release(self, worker: int, end: int):
+        """Marks all records of a slot before the given index as consumed, allowing the worker to overwrite them.
+
+        Args:
+            worker (int): slot index
+            end (int): index after the last consumed record
+        """
+        self._released[worker] = max(int(self._released[worker]), min(end, int(self._written[worker])))
+
+    def release_all(self, end: int):
+        """Marks all records of all slots before the given index as consumed (see release).
+
+        Args:
+            end (int): index after the last consumed record
+        """
+        for worker in range(self.num_workers):
+            self.release(worker, end)
+
+    def close(self):
+        """Detaches from the shared memory block. Views returned by batch() must not be used afterwards."""
+        self._arrays = {}
+        self._written = self._released = None
+        self._memory.close()
+
+    def unlink(self):
+        """Frees the shared memory block. Must be called once by the creating process."""
+        self._memory.unlink()
+
+    def _ring_index(self, worker: int, start: int, size: int):
+        if start < self._released[worker] or start + size > self._written[worker]:
+            raise ValueError('Records %d to %d of slot %d are not available' % (start, start + size, worker))
+
+        index = start % self.capacity
+        if index + size > self.capacity:
+            raise ValueError('Batch of size %d at record %d wraps around the ring of capacity %d' % (size, start, self.capacity))
+        return index
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        if self._owner:
+            self.unlink()
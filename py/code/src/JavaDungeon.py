@@ -20,56 +20,27 @@ from level.elements.room import Tile
 from level.generator.dummy import DummyGenerator
 from level.generator.LevelLoader import LevelLoader
 
-def is_position_accessible(dungeon: Level, point: Point):
-    """Checks if a position is accessible in a dungeon
+from Position import Position
+from SparseLevel import SparseLevel
 
-    Args:
-        dungeon (Level): a dungeon
-        point (Point): a position
-
-    Returns:
-        bool: True if point is accessible in the dungeon else False
-    """
-    return dungeon.getTileAt(point.toCoordinate()).isAccessible()
-
-def get_accessible_coordinates(dungeon: Level):
-    """Lists coordinates of all accessible tiles in a dungeon
-
-    Args:
-        dungeon (Level): a dungeon
-
-    Returns:
-        [Coordinate]: Array of accessible coordinates
-    """
-    return [
-        tile.getGlobalPosition()
-        for room in dungeon.getRooms()
-        for sub_list in room.getLayout()
-        for tile in sub_list
-        if tile.isAccessible()
-    ]
-
-def get_dungeon_bounds(dungeon: Level):
-    """Returns the minimum and maximum coordinate values of accessible tiles in a dungeon.
+def get_sparse_level(dungeon: Level, chunk_size: int = 16):
+    """Builds a python-side accessibility map of a dungeon without listing all tiles. The environments query
+    this map while stepping instead of the Java level, so that no calls cross the JVM boundary.
 
     Args:
         dungeon (Level): a dungeon
+        chunk_size (int, optional): edge length of a chunk in tiles. Defaults to 16.
 
     Returns:
-        int, int, int, int: Minimum x, minimum y, maximum x, maximum y
-    """
-    accessible_coordinates = get_accessible_coordinates(dungeon)
-    x = [coordinate.x for coordinate in accessible_coordinates]
-    y = [coordinate.y for coordinate in accessible_coordinates]
-    return min(x), min(y), max(x), max(y)
-
-def point_as_array(point: Point):
-    """Convert a point into an array
-
-    Args:
-        point (Point): a point
-
-    Returns:
-        array: x,y coordinates as array
+        SparseLevel: chunked accessibility map
     """
-    return [point.x, point.y]
\ No newline at end of file
+    return SparseLevel(
+        (
+            Position.from_point(tile.getGlobalPosition())
+            for room in dungeon.getRooms()
+            for sub_list in room.getLayout()
+            for tile in sub_list
+            if tile.isAccessible()
+        ),
+        chunk_size
+    )
@@ -1,35 +1,50 @@
 import random
 import numpy as np
-from math import sqrt, pow
-from itertools import cycle, islice
 
 from tensorforce import Environment
-from JavaDungeon import Point, Level
-from JavaDungeon import is_position_accessible, get_accessible_coordinates, get_dungeon_bounds, point_as_array
-from collections import namedtuple
+from JavaDungeon import Level
+from JavaDungeon import get_sparse_level
+from Position import Position, positions_as_array
+from SparseLevel import SparseLevel
+from Rewards import compile_rewards, compile_termination
 
 class MultiActorDungeon(Environment):
     """An RF learning environment with multiple actors.
     Based on https://github.com/tensorforce/tensorforce/blob/master/examples/multiactor_environment.py
     """
 
-    def __init__(self, dungeon: Level):
+    # Actor 1 evades, actor 2 pursues
+    default_rewards = [dict(type="pursuit_evasion", value=1.0)]
+
+    def __init__(self, dungeon: Level, rewards: list = None, seed: int = None):
         super().__init__()
 
+        # Random number generator
+        self._random = random.Random(seed)
+
         # Dungeon level (java class)
         self.dungeon = dungeon
 
+        # Accessibility map
+        self.level = get_sparse_level(dungeon)
+
         # State space
         state_indices = [0, 1, 2, 3] # 2D coordinates for two actors
         self._state_indices = np.array(state_indices, np.int32)
-        self._state_bounds = self.get_state_bounds(dungeon)
-
-        # Coordinates of all accessible tiles
-        self.accessible_positions = [coordinate.toPoint() for coordinate in get_accessible_coordinates(dungeon)]
+        self._state_bounds = self.get_state_bounds(self.level)
 
         # Step size
         self.step_size = 1
 
+        # Reward and termination (no goal, episodes end with the timestep limit)
+        self._reward = compile_rewards(self.default_rewards if rewards is None else rewards, num_actors=self.num_actors())
+        self._terminal = compile_termination()
+
+        # Buffers for reward evaluation
+        self._current_state_buffer = np.empty((self.num_actors(), 2), dtype=np.int32)
+        self._next_state_buffer = np.empty((self.num_actors(), 2), dtype=np.int32)
+        self._positions_buffer = np.empty((self.num_actors(), 2), dtype=np.int32)
+
     def states(self):
         return dict(
             type=float,
@@ -49,19 +64,24 @@ class MultiActorDungeon(Environment):
         self._parallel_indices = np.arange(self.num_actors())
 
         # get random (but different) initial positions for all actors
-        self._internal_state = random.sample(self.accessible_positions, self.num_actors())
+        self._internal_state = [
+            self.level.position(index)
+            for index in self._random.sample(range(len(self.level)), self.num_actors())
+        ]
 
         # Always for multi-actor environments: return per-actor values
         return self._parallel_indices.copy(), self.external_state()
 
     def execute(self, actions):
-        current_state = self._internal_state
-        next_state = self.next_state(actions)
+        next_positions = self.next_state(actions)
+        current_state = positions_as_array(self._internal_state, out=self._current_state_buffer)
+        next_state = positions_as_array(next_positions, out=self._next_state_buffer)
+        actions = np.asarray(actions)
         terminal = self.is_terminal(current_state, actions, next_state)
         reward = self.reward(current_state, actions, next_state)
 
         # update internal state
-        self._internal_state = next_state
+        self._internal_state = next_positions
 
         # always for multi-actor environments: update parallel indices, and return per-actor values
         self._parallel_indices = self._parallel_indices[~terminal]
@@ -69,48 +89,29 @@ class MultiActorDungeon(Environment):
         return self._parallel_indices.copy(), self.external_state(), terminal, reward
 
     def is_terminal(self, current_state, actions, next_state):
-        # return False for all active actors
-        return np.full_like(self._parallel_indices, False)
+        return self._terminal(current_state, actions, next_state)
 
     def reward(self, current_state, actions, next_state):
-        # actor indices
-        actor_1 = 0
-        actor_2 = 1
-
-        # distance between actor positions in the current state
-        current_distance = self.straight_line_distance(current_state[actor_1], current_state[actor_2])
-
-        # after action change of distance with respect to the current state
-        new_distances = np.array([
-            self.straight_line_distance(next_state[actor_1], current_state[actor_2]),
-            self.straight_line_distance(next_state[actor_2], current_state[actor_1])
-        ])
-        delta = new_distances - current_distance
-
-        # set reward to -1, 0 or 1 depending on distance change
-        reward_value = lambda x : 1 if x > 0 else (-1 if x < 0 else 0)
-        return np.array([
-             reward_value(delta[actor_1]),
-            -reward_value(delta[actor_2])
-        ])
-
-    def get_state_bounds(self, dungeon: Level):
-        x_min, y_min, x_max, y_max = get_dungeon_bounds(dungeon)
+        return self._reward(current_state, actions, next_state)
+
+    def get_state_bounds(self, level: SparseLevel):
+        x_min, y_min, x_max, y_max = level.bounds()
         return np.array([[x_min, y_min, x_min, y_min],[x_max, y_max, x_max, y_max]])
 
-    def next_position(self, current_position: Point, action: int):
+    def next_position(self, current_position: Position, action: int):
         # Actions {0: go north, 1: go south, 2: go west, 3: go east, 4: do nothing}
-        next_position = Point(current_position)
+        dx, dy = 0, 0
         if action == 0:
-            next_position.y += self.step_size
+            dy = self.step_size
         elif action == 1:
-            next_position.y -= self.step_size
+            dy = -self.step_size
         elif action == 2:
-            next_position.x -= self.step_size
+            dx = -self.step_size
         elif action == 3:
-            next_position.x += self.step_size
+            dx = self.step_size
 
-        if is_position_accessible(self.dungeon, next_position):
+        next_position = current_position.moved(dx, dy)
+        if next_position in self.level:
             return next_position
         return current_position
 
@@ -120,9 +121,6 @@ class MultiActorDungeon(Environment):
             for i in self._parallel_indices
         ]
 
-    def straight_line_distance(self, source: Point, destination: Point):
-        return sqrt(pow(destination.x - source.x, 2) + pow(destination.y - source.y, 2))
-
     def actor_perspectives(self):
         """Returns the external state from each actors perspective.
 
@@ -135,20 +133,22 @@ class MultiActorDungeon(Environment):
         Returns:
             list: List of external states
         """
-        cyclic_perspective = lambda x: list(islice(cycle(self._internal_state), x, x + len(self._internal_state)))
-        perspectives = [
-            cyclic_perspective(start)
-            for start in range(len(self._internal_state))
-        ]
-
-        return [
-            np.array(list(map(point_as_array, perspective)), dtype=np.float32).flatten()
-            for perspective in perspectives
-        ]
+        return list(self.external_state())
 
     def external_state(self):
-        # TODO: Check if stacking is even necessary here. If not actor_perspectives method can be renamed and this part removed.
-        return np.stack(self.actor_perspectives(), axis=0)
+        """Returns the stacked actor perspectives (see actor_perspectives) as array of shape [actors, 2 * actors].
+
+        Returns:
+            array: external state
+        """
+        positions = positions_as_array(self._internal_state, out=self._positions_buffer)
+        observation = np.empty((len(positions), positions.size), dtype=np.float32)
+        for start in range(len(positions)):
+            observation[start] = np.roll(positions, -start, axis=0).ravel()
+        return observation
+
+    def seed(self, seed: int = None):
+        self._random.seed(seed)
 
     def disable_action_masking(self):
         pass
@@ -4,12 +4,14 @@ import matplotlib
 matplotlib.use('Agg')
 import matplotlib.pyplot as plt
 from collections import namedtuple
+from functools import partial
 from os.path import join
 
 from tensorforce.environments import Environment
 from tensorforce.agents import Agent
-from JavaDungeon import LevelLoader, Point
+from JavaDungeon import LevelLoader
 from DungeonTFEnvironment import DungeonTFEnvironment
+from Seeding import derive_seed, ENVIRONMENT_STREAM
 
 def setupArgumentParser():
     parser = argparse.ArgumentParser()
@@ -23,7 +25,9 @@ def loadConfigurationFromFile(path):
 
 def CreateEnvironment(config):
     dungeon = DungeonTFEnvironment(
-        dungeon=LevelLoader().loadLevel(config["environment"]["dungeon"])
+        dungeon=LevelLoader().loadLevel(config["environment"]["dungeon"]),
+        rewards=config["environment"].get("rewards"),
+        seed=derive_seed(config["environment"].get("seed"), ENVIRONMENT_STREAM, 0)
     )
 
     if config["environment"]["disable_action_masking"]:
@@ -37,6 +41,12 @@ def CreateEnvironment(config):
     return dungeon, environment
 
 def CreateAgent(config, environment):
+    if config.get("framework") == "stable-baselines3":
+        from StableBaselines.TrainBaselines import loadModel, predict
+        assert config["environment"]["n_actions"] == environment.actions()["num_values"], \
+            "Stable-Baselines3 models can only be evaluated if trained with --n_actions %d." % environment.actions()["num_values"]
+        return partial(predict, loadModel(config))
+
     return Agent.load(
         directory=join(config["output"], "numpy-model"),
         format='numpy',
@@ -48,19 +58,26 @@ def EvaluateModel(dungeon, environment, agent):
     StateAction = namedtuple("StateAction", ["xPos", "yPos", "action"])
     state_action_list = []
 
-    for coordinate in dungeon.start_positions:
-        states = environment.set_state(Point(coordinate.x, coordinate.y))
-        internals = agent.initial_internals()
+    for coordinate in dungeon.level:
+        if coordinate == dungeon.goal:
+            continue
+
+        states = environment.set_state(coordinate)
 
-        actions, internals = agent.act(
-            states=states, internals=internals,
-            independent=True, deterministic=True
-        )
+        if isinstance(agent, Agent):
+            internals = agent.initial_internals()
+            actions, internals = agent.act(
+                states=states, internals=internals,
+                independent=True, deterministic=True
+            )
+        else:
+            actions = agent(states)
 
         s = StateAction(xPos=coordinate.x, yPos=coordinate.y, action=actions)
         state_action_list.append(s)
     
-    agent.close()
+    if isinstance(agent, Agent):
+        agent.close()
     environment.close()
     
     return state_action_list
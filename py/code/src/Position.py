@@ -0,0 +1,94 @@
+import numpy as np
+
+class Position:
+    """A lightweight, immutable and hashable 2D integer position.
+
+    Used instead of the Java Point class inside the environments so that stepping does not cross the JVM
+    boundary. Conversion from and to Java objects happens only at API boundaries (see JavaDungeon).
+    """
+    __slots__ = ("x", "y")
+
+    def __init__(self, x: int, y: int):
+        object.__setattr__(self, "x", int(x))
+        object.__setattr__(self, "y", int(y))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Position is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("Position is immutable")
+
+    def __reduce__(self):
+        return (Position, (self.x, self.y))
+
+    @classmethod
+    def from_point(cls, point):
+        """Creates a position from any object with x and y attributes (e.g. a Java Point or Coordinate)
+
+        Args:
+            point (Point | Coordinate): a point
+
+        Returns:
+            Position: the position
+        """
+        return cls(int(point.x), int(point.y))
+
+    def moved(self, dx: int, dy: int):
+        """Returns a new position shifted by the given offsets
+
+        Args:
+            dx (int): offset in x direction
+            dy (int): offset in y direction
+
+        Returns:
+            Position: shifted position
+        """
+        return Position(self.x + dx, self.y + dy)
+
+    def __eq__(self, other):
+        if not isinstance(other, Position):
+            return NotImplemented
+        return self.x == other.x and self.y == other.y
+
+    def __hash__(self):
+        return hash((self.x, self.y))
+
+    def __iter__(self):
+        yield self.x
+        yield self.y
+
+    def __repr__(self):
+        return "Position(%d, %d)" % (self.x, self.y)
+
+def position_as_array(position: Position, out=None):
+    """Writes a position into an int32 array
+
+    Args:
+        position (Position): a position
+        out (array, optional): array of shape [2] to write into. Defaults to None (new array).
+
+    Returns:
+        array: x,y coordinates as array
+    """
+    if out is None:
+        out = np.empty(2, dtype=np.int32)
+    out[0] = position.x
+    out[1] = position.y
+    return out
+
+def positions_as_array(positions: list, out=None):
+    """Writes a list of positions into an int32 array
+
+    Args:
+        positions (list[Position]): list of positions
+        out (array, optional): array of shape [len(positions), 2] to write into. Defaults to None (new array).
+
+    Returns:
+        array: array of shape [len(positions), 2] with x,y coordinates
+    """
+    if out is None:
+        out = np.empty((len(positions), 2), dtype=np.int32)
+    for i, position in enumerate(positions):
+        out[i, 0] = position.x
+        out[i, 1] = position.y
+    return out
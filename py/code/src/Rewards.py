@@ -0,0 +1,160 @@
+import numpy as np
+
+# Actions {0: go north, 1: go south, 2: go west, 3: go east, 4: do nothing}
+NOOP_ACTION = 4
+
+# Null reward everywhere except when reaching the goal (default of the single actor environments)
+DEFAULT_REWARDS = [dict(type="goal_reached", value=1.0)]
+
+def goal_reached(goal, value: float = 1.0):
+    """Reward for reaching the goal position
+
+    Args:
+        goal (array): goal position [x, y]
+        value (float, optional): reward if the goal is reached. Defaults to 1.0.
+
+    Returns:
+        function: array function (state, action, next_state) -> reward
+    """
+    goal = np.asarray(goal, dtype=np.int32)
+    return lambda state, action, next_state: value * np.all(next_state == goal, axis=-1)
+
+def distance_delta(goal, scale: float = 1.0):
+    """Reward proportional to the decrease of the straight line distance to the goal
+
+    Args:
+        goal (array): goal position [x, y]
+        scale (float, optional): reward per unit of distance gained. Defaults to 1.0.
+
+    Returns:
+        function: array function (state, action, next_state) -> reward
+    """
+    goal = np.asarray(goal, dtype=np.int32)
+    return lambda state, action, next_state: scale * (
+        np.linalg.norm(state - goal, axis=-1) - np.linalg.norm(next_state - goal, axis=-1)
+    )
+
+def step_penalty(value: float = 0.01):
+    """Constant penalty for every step taken
+
+    Args:
+        value (float, optional): penalty per step. Defaults to 0.01.
+
+    Returns:
+        function: array function (state, action, next_state) -> reward
+    """
+    return lambda state, action, next_state: np.full(np.shape(action), -value)
+
+def collision_penalty(value: float = 0.1):
+    """Penalty for movement actions that did not change the position (i.e. ran into a wall)
+
+    Args:
+        value (float, optional): penalty per collision. Defaults to 0.1.
+
+    Returns:
+        function: array function (state, action, next_state) -> reward
+    """
+    return lambda state, action, next_state: -value * (
+        np.all(state == next_state, axis=-1) & (np.asarray(action) != NOOP_ACTION)
+    )
+
+def pursuit_evasion(value: float = 1.0):
+    """Zero-sum reward for two actors where the first actor evades and the second pursues.
+
+    Each actors move is judged against the other actors current position. The evader receives +value
+    for increasing the distance and -value for decreasing it, the pursuer receives the opposite.
+
+    Args:
+        value (float, optional): absolute reward per step. Defaults to 1.0.
+
+    Returns:
+        function: array function (state, action, next_state) -> reward, with states of shape [..., 2, 2]
+    """
+    roles = np.array([1.0, -1.0])
+
+    def reward(state, action, next_state):
+        current_distance = np.linalg.norm(state[..., 1, :] - state[..., 0, :], axis=-1)
+        new_distances = np.linalg.norm(next_state - state[..., ::-1, :], axis=-1)
+        delta = new_distances - current_distance[..., np.newaxis]
+        return value * roles * np.sign(delta)
+
+    return reward
+
+reward_terms = {
+    "goal_reached": goal_reached,
+    "distance_delta": distance_delta,
+    "step_penalty": step_penalty,
+    "collision_penalty": collision_penalty,
+    "pursuit_evasion": pursuit_evasion,
+}
+
+# Terms that are computed relative to the goal position (passed as first argument)
+goal_terms = {"goal_reached", "distance_delta"}
+
+# Terms that are only defined for a fixed number of actors, all other terms accept any number
+actor_terms = {"pursuit_evasion": 2}
+
+def compile_rewards(declarations: list, goal=None, num_actors: int = 1):
+    """Compiles reward declarations into a single array function.
+
+    A declaration is a dictionary with a "type" key naming one of the reward terms and optional keyword
+    arguments of that term, e.g. {"type": "step_penalty", "value": 0.01}. The rewards of all declared terms
+    are summed up. The compiled function accepts arbitrary leading batch dimensions, positions are given as
+    integer arrays with the x and y coordinates in the last dimension. States of single actor environments
+    have the shape [..., 2], states of environments with multiple actors the shape [..., num_actors, 2].
+    The function keeps no references to its arguments, so environments can evaluate it on reused buffers
+    while returning observations as new arrays.
+
+    Args:
+        declarations (list[dict]): reward declarations
+        goal (array, optional): goal position [x, y] used by goal based terms. Defaults to None.
+        num_actors (int, optional): number of actors of the environment. Defaults to 1.
+
+    Raises:
+        ValueError: raised if a declaration has an unknown type or does not fit the environment (missing goal
+            position or unsupported number of actors)
+
+    Returns:
+        function: array function (state, action, next_state) -> reward
+    """
+    terms = [_compile_term(declaration, goal, num_actors) for declaration in declarations]
+
+    def reward(state, action, next_state):
+        total = np.zeros(np.shape(action), dtype=np.float32)
+        for term in terms:
+            total = total + term(state, action, next_state)
+        return total.astype(np.float32)
+
+    return reward
+
+def compile_termination(goal=None):
+    """Compiles the termination condition of an environment into an array function.
+
+    Args:
+        goal (array, optional): goal position [x, y]. If None episodes never terminate. Defaults to None.
+
+    Returns:
+        function: array function (state, action, next_state) -> terminal
+    """
+    if goal is None:
+        return lambda state, action, next_state: np.zeros(np.shape(action), dtype=bool)
+
+    goal = np.asarray(goal, dtype=np.int32)
+    return lambda state, action, next_state: np.all(next_state == goal, axis=-1)
+
+def _compile_term(declaration: dict, goal, num_actors: int):
+    arguments = dict(declaration)
+    term_type = arguments.pop("type", None)
+    if term_type not in reward_terms:
+        raise ValueError("Unknown reward type '{}'. Valid types are {}".format(term_type, list(reward_terms)))
+
+    if actor_terms.get(term_type, num_actors) != num_actors:
+        raise ValueError("Reward type '{}' requires an environment with {} actors, the environment has {}".format(
+            term_type, actor_terms[term_type], num_actors
+        ))
+
+    if term_type in goal_terms:
+        if goal is None:
+            raise ValueError("Reward type '{}' requires an environment with a goal position".format(term_type))
+        return reward_terms[term_type](goal, **arguments)
+    return reward_terms[term_type](**arguments)
@@ -0,0 +1,132 @@
+import numpy as np
+
+# Streams derived from a master seed, environments are additionally indexed by their rank
+ENVIRONMENT_STREAM = 0
+AGENT_STREAM = 1
+ACTION_STREAM = 2
+
+def derive_seed(seed, *indices: int):
+    """Derives an independent seed for one of several environments or worker processes from a master seed.
+
+    Derived seeds are statistically independent (see numpy.random.SeedSequence) and depend only on the
+    master seed and the indices, so they are identical in every process. For example the seed of the
+    environment with rank 3 is derive_seed(seed, ENVIRONMENT_STREAM, 3).
+
+    Args:
+        seed (int | None): master seed. If None no seed is derived.
+        *indices (int): stream and index of the environment or worker
+
+    Returns:
+        int | None: derived seed
+    """
+    if seed is None:
+        return None
+    return int(np.random.SeedSequence(seed, spawn_key=indices).generate_state(1, np.uint32)[0])
+
+def record_rollout(environment, num_steps: int, seed: int = None):
+    """Performs random actions in an environment and records the resulting trajectory.
+
+    The environment is reset at the beginning and whenever an episode ends. Actions are drawn uniformly from
+    the actions allowed by the current action mask. Supports the Gym, Tensorforce and multi-actor environments
+    of this package.
+
+    Args:
+        environment (DungeonGymEnvironment | DungeonTFEnvironment | MultiActorDungeon): a freshly created environment
+        num_steps (int): number of steps to record
+        seed (int, optional): seed for the random actions. Defaults to None.
+
+    Returns:
+        dict[actions, trajectory]: the performed actions and the observed trajectory
+    """
+    rng = np.random.default_rng(seed)
+    num_actions = _num_actions(environment)
+    actions = []
+
+    def next_action(num_active, action_mask):
+        if num_active is not None:
+            action = rng.integers(num_actions, size=num_active).tolist()
+        elif action_mask is not None:
+            action = int(rng.choice(np.flatnonzero(action_mask)))
+        else:
+            action = int(rng.integers(num_actions))
+        actions.append(action)
+        return action
+
+    trajectory = _rollout(environment, next_action, num_steps)
+    return dict(actions=actions, trajectory=trajectory)
+
+def replay_rollout(environment, recording: dict):
+    """Replays a recorded action sequence and asserts that the trajectory is identical to the recorded one.
+
+    Args:
+        environment (DungeonGymEnvironment | DungeonTFEnvironment | MultiActorDungeon): a freshly created
+            environment with the same level and seed as the recorded one
+        recording (dict[actions, trajectory]): recording created by record_rollout
+
+    Raises:
+        AssertionError: raised if the trajectories differ
+    """
+    actions = iter(recording["actions"])
+    trajectory = _rollout(environment, lambda num_active, action_mask: next(actions), len(recording["actions"]))
+
+    for step, (expected, actual) in enumerate(zip(recording["trajectory"], trajectory)):
+        assert expected == actual, "Trajectories differ at step %d: expected %s but got %s" % (step, expected, actual)
+    assert len(recording["trajectory"]) == len(trajectory), "Trajectories differ in length"
+
+def _num_actions(environment):
+    if hasattr(environment, "action_space"):
+        return environment.action_space.n
+    return environment.actions()["num_values"]
+
+def _rollout(environment, next_action, num_steps: int):
+    # Every entry of the trajectory is converted to nested lists so that recordings can be stored as JSON
+    is_gym = hasattr(environment, "step")
+    is_multi_actor = not is_gym and environment.num_actors() > 1
+
+    def reset():
+        states = environment.reset()
+        trajectory.append(_as_list(states))
+        return environment.num_actors() if is_multi_actor else None, action_mask_of(states)
+
+    def action_mask_of(states):
+        if is_gym:
+            return environment.action_masks()
+        if isinstance(states, dict):
+            return states["action_mask"]
+        return None
+
+    trajectory = []
+    num_active, action_mask = reset()
+
+    for _ in range(num_steps):
+        action = next_action(num_active, action_mask)
+        if is_gym:
+            result = environment.step(action)
+            done = result[2]
+            result = result[:3]
+        elif is_multi_actor:
+            result = environment.execute(np.asarray(action))
+            num_active = len(result[0])
+            done = num_active == 0
+        else:
+            result = environment.execute(action)
+            done = result[1]
+
+        trajectory.append(_as_list(result))
+        action_mask = action_mask_of(result[0])
+
+        if done:
+            num_active, action_mask = reset()
+
+    return trajectory
+
+def _as_list(value):
+    if isinstance(value, dict):
+        return {key: _as_list(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_as_list(item) for item in value]
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
@@ -0,0 +1,122 @@
+import numpy as np
+from Position import Position
+
+class SparseLevel:
+    """Accessibility map of a dungeon stored as dense square chunks with a global index.
+
+    Only chunks containing at least one accessible tile are allocated, so memory grows with the accessible area
+    instead of the bounding box of the dungeon (empty space between rooms costs nothing). Accessibility queries
+    are a dictionary lookup followed by an array access, i.e. O(1).
+    """
+
+    def __init__(self, positions, chunk_size: int = 16):
+        """Build the map from the positions of all accessible tiles.
+
+        Args:
+            positions (iterable[Position]): positions of accessible tiles
+            chunk_size (int, optional): edge length of a chunk in tiles. Defaults to 16.
+
+        Raises:
+            ValueError: raised if chunk size is invalid (<1)
+        """
+        if chunk_size <= 0:
+            raise ValueError('Chunk size cannot be less than 1. Given value %d' % (chunk_size))
+
+        self.chunk_size = chunk_size
+        self._chunks = {}
+        for position in positions:
+            key = (position.x // chunk_size, position.y // chunk_size)
+            chunk = self._chunks.get(key)
+            if chunk is None:
+                chunk = self._chunks[key] = np.zeros((chunk_size, chunk_size), dtype=bool)
+            chunk[position.x % chunk_size, position.y % chunk_size] = True
+
+        # Chunks in a fixed order with cumulative tile counts for indexed access
+        self._keys = sorted(self._chunks)
+        self._offsets = np.cumsum([0] + [int(self._chunks[key].sum()) for key in self._keys])
+
+    def is_accessible(self, x: int, y: int):
+        """Checks if the tile at a position is accessible
+
+        Args:
+            x (int): x coordinate
+            y (int): y coordinate
+
+        Returns:
+            bool: True if the tile is accessible else False
+        """
+        chunk = self._chunks.get((x // self.chunk_size, y // self.chunk_size))
+        return chunk is not None and bool(chunk[x % self.chunk_size, y % self.chunk_size])
+
+    def __contains__(self, position):
+        return self.is_accessible(position.x, position.y)
+
+    def __len__(self):
+        return int(self._offsets[-1])
+
+    def __iter__(self):
+        for key in self._keys:
+            for x, y in zip(*np.nonzero(self._chunks[key])):
+                yield Position(key[0] * self.chunk_size + int(x), key[1] * self.chunk_size + int(y))
+
+    def position(self, index: int):
+        """Returns the accessible position with the given index (in iteration order) without listing all positions
+
+        Args:
+            index (int): index in [0, len(self))
+
+        Raises:
+            IndexError: raised if the index is out of range
+
+        Returns:
+            Position: the position
+        """
+        if not 0 <= index < len(self):
+            raise IndexError('Position index %d out of range' % (index))
+
+        chunk_index = int(np.searchsorted(self._offsets, index, side='right')) - 1
+        key = self._keys[chunk_index]
+        x, y = (axis[index - self._offsets[chunk_index]] for axis in np.nonzero(self._chunks[key]))
+        return Position(key[0] * self.chunk_size + int(x), key[1] * self.chunk_size + int(y))
+
+    def random_position(self, rng, exclude=()):
+        """Draws a uniformly distributed accessible position without listing all positions
+
+        Args:
+            rng (random.Random): random number generator
+            exclude (iterable[Position], optional): positions that must not be drawn. Defaults to ().
+
+        Raises:
+            ValueError: raised if no position can be drawn
+
+        Returns:
+            Position: the position
+        """
+        exclude = [position for position in exclude if position in self]
+        if len(self) <= len(set(exclude)):
+            raise ValueError('No accessible position left to draw')
+
+        while True:
+            position = self.position(rng.randrange(len(self)))
+            if position not in exclude:
+                return position
+
+    def bounds(self):
+        """Returns the minimum and maximum coordinate values of accessible tiles.
+
+        Returns:
+            int, int, int, int: Minimum x, minimum y, maximum x, maximum y
+        """
+        x_min, y_min, x_max, y_max = [], [], [], []
+        for (cx, cy), chunk in self._chunks.items():
+            xs, ys = np.nonzero(chunk)
+            x_min.append(cx * self.chunk_size + int(xs.min()))
+            y_min.append(cy * self.chunk_size + int(ys.min()))
+            x_max.append(cx * self.chunk_size + int(xs.max()))
+            y_max.append(cy * self.chunk_size + int(ys.max()))
+        return min(x_min), min(y_min), max(x_max), max(y_max)
+
+    @property
+    def nbytes(self):
+        """Memory used by the chunks in bytes"""
+        return sum(chunk.nbytes for chunk in self._chunks.values())
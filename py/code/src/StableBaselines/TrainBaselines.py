@@ -0,0 +1,186 @@
+from functools import partial
+from os.path import join
+from time import perf_counter
+
+from gym.wrappers import TimeLimit
+from stable_baselines3 import A2C, DQN, PPO
+from stable_baselines3.common.monitor import Monitor
+from stable_baselines3.common.utils import set_random_seed
+from stable_baselines3.common.vec_env import DummyVecEnv, SubprocVecEnv
+from DungeonGymEnvironment import DungeonGymEnvironment
+from JavaDungeon import LevelLoader
+from Seeding import derive_seed, ENVIRONMENT_STREAM, AGENT_STREAM
+from TrainModel import setupArgumentParser, assembleConfiguration, saveConfiguration, checkPositive, reportThroughput
+
+# Algorithms with action masking support (optional dependency sb3-contrib)
+try:
+    from sb3_contrib import MaskablePPO
+except ImportError:
+    MaskablePPO = None
+
+algorithm_map = {"ppo": PPO, "a2c": A2C, "dqn": DQN, "maskable_ppo": MaskablePPO}
+vec_env_map = {"dummy": DummyVecEnv, "subprocess": partial(SubprocVecEnv, start_method="spawn")}
+
+def createEnvironment(config: dict, rank: int):
+    """Creates one independent environment of a vectorized environment.
+
+    Every environment loads its own copy of the level and gets a seed derived from the master seed.
+
+    Args:
+        config (dict): The training configuration.
+        rank (int): Index of the environment.
+
+    Returns:
+        gym.Env: The environment.
+    """
+    environment = DungeonGymEnvironment(
+        dungeon=LevelLoader().loadLevel(config["environment"]["dungeon"]),
+        n_actions=config["environment"]["n_actions"],
+        rewards=config["environment"]["rewards"],
+        seed=derive_seed(config["environment"]["seed"], ENVIRONMENT_STREAM, rank)
+    )
+    if config["environment"]["disable_action_masking"]:
+        environment.disable_action_masking()
+    environment = TimeLimit(environment, max_episode_steps=config["environment"]["max_timesteps"])
+    return Monitor(environment)
+
+def createModel(config: dict, environment):
+    """Creates a Stable-Baselines3 model from the agent configuration.
+
+    The agent configuration contains the algorithm name ("agent"), the policy ("policy", defaults to MlpPolicy)
+    and further keyword arguments of the algorithm.
+
+    Args:
+        config (dict): The training configuration.
+        environment (VecEnv): The vectorized environment.
+
+    Raises:
+        ValueError: Raised if the algorithm is unknown or not installed.
+
+    Returns:
+        BaseAlgorithm: The model.
+    """
+    arguments = dict(config["agent"])
+    algorithm = arguments.pop("agent")
+    policy = arguments.pop("policy", "MlpPolicy")
+
+    if algorithm_map.get(algorithm) is None:
+        raise ValueError("Unknown or not installed algorithm '{}'. Valid algorithms are {}".format(
+            algorithm, [name for name, cls in algorithm_map.items() if cls is not None]
+        ))
+
+    # Tensorforce style summarizer is mapped to a tensorboard log directory
+    summarizer = arguments.pop("summarizer", None)
+    if summarizer is not None:
+        arguments["tensorboard_log"] = summarizer["directory"]
+
+    # The environments are seeded in createEnvironment. The model must not get a seed since SB3 would
+    # reseed all environments with seed + rank. Instead the agent stream seeds the model directly.
+    seed = derive_seed(config["environment"]["seed"], AGENT_STREAM)
+    if seed is not None:
+        set_random_seed(seed)
+
+    model = algorithm_map[algorithm](policy, environment, **arguments)
+    if seed is not None:
+        model.action_space.seed(seed)
+    return model
+
+def loadModel(config: dict):
+    """Loads a model saved by train.
+
+    Args:
+        config (dict): The training configuration.
+
+    Returns:
+        BaseAlgorithm: The model.
+    """
+    return algorithm_map[config["agent"]["agent"]].load(join(config["output"], "sb3-model"))
+
+def predict(model, states: dict):
+    """Returns the deterministic action of a model for a state of DungeonTFEnvironment.
+
+    Args:
+        model (BaseAlgorithm): The model.
+        states (dict[state, action_mask]): The state and action mask.
+
+    Returns:
+        int: The action.
+    """
+    if MaskablePPO is not None and isinstance(model, MaskablePPO):
+        action, _ = model.predict(states["state"], deterministic=True, action_masks=states["action_mask"])
+    else:
+        action, _ = model.predict(states["state"], deterministic=True)
+    return int(action)
+
+def train(config: dict):
+    """Trains a RL model with Stable-Baselines3.
+
+    The model is saved as "sb3-model.zip" in the output directory.
+
+    Args:
+        config (dict): The training configuration.
+    """
+    environment = vec_env_map[config["runner"]["vec_env"]]([
+        partial(createEnvironment, config, rank)
+        for rank in range(config["runner"]["n_envs"])
+    ])
+
+    model = createModel(config, environment)
+
+    start = perf_counter()
+    model.learn(total_timesteps=config["runner"]["timesteps"])
+    reportThroughput(model.num_timesteps, perf_counter() - start)
+
+    model.save(join(config["output"], "sb3-model"))
+
+    environment.close()
+
+def setupBaselinesArgumentParser():
+    """Configure a command line argument parser. Extends the parser of TrainModel.
+
+    Returns:
+        ArgumentParser: A command line argument parser.
+    """
+    parser = setupArgumentParser()
+    parser.add_argument("-t", "--timesteps", type=checkPositive, default=None,
+                        help="Total timesteps. Defaults to episodes * max_timesteps")
+    parser.add_argument("-n", "--n_envs", type=checkPositive, default=1, help="Number of parallel environments")
+    parser.add_argument("--vec_env", type=str, choices=list(vec_env_map), default="dummy", help="")
+    parser.add_argument("--n_actions", type=checkPositive, default=4, help="")
+    return parser
+
+def assembleBaselinesConfiguration(args):
+    """Assembles a training configuration in the format of TrainModel with additional Stable-Baselines3 entries.
+
+    Options of TrainModel that are not supported by the Stable-Baselines3 driver are rejected.
+
+    Args:
+        args (Namespace): Namespace with the parsed command line arguments
+
+    Returns:
+        dict: A dictionary representing the configuration
+    """
+    assert args.environment == "single", "Stable-Baselines3 training supports single actor environments only."
+    assert args.reward_shaping is None, "Stable-Baselines3 training is currently not compatible with the reward shaping option."
+    assert args.check_reproducibility is None and args.replay is None, \
+        "Stable-Baselines3 training does not support the reproducibility check."
+
+    config = assembleConfiguration(args)
+    assert config["environment"]["disable_action_masking"] or config["agent"]["agent"] == "maskable_ppo", \
+        "Action masking requires the maskable_ppo algorithm (use --disable_action_masking for other algorithms)."
+
+    config["framework"] = "stable-baselines3"
+    config["environment"]["n_actions"] = args.n_actions
+    config["agent"].pop("config", None)
+    config["runner"].update(
+        timesteps=args.timesteps or args.episodes * args.max_timesteps,
+        n_envs=args.n_envs,
+        vec_env=args.vec_env
+    )
+    return config
+
+if __name__ == '__main__':
+    parser = setupBaselinesArgumentParser()
+    config = assembleBaselinesConfiguration(parser.parse_args())
+    saveConfiguration(config)
+    train(config)
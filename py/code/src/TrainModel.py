@@ -4,28 +4,45 @@ from tensorforce.execution import Runner
 from JavaDungeon import LevelLoader
 from DungeonTFEnvironment import DungeonTFEnvironment
 from MultiActorDungeon import MultiActorDungeon
+from Seeding import derive_seed, record_rollout, replay_rollout, ENVIRONMENT_STREAM, AGENT_STREAM, ACTION_STREAM
 
 import argparse
 import json
+from time import perf_counter
 from os import makedirs
 from os.path import join, abspath, exists
 
 
-def train(config: dict):
-    """Trains a RL model.
+def createDungeonEnvironment(config: dict):
+    """Creates the dungeon environment described by a training configuration.
 
     Args:
         config (dict): The training configuration.
+
+    Returns:
+        DungeonTFEnvironment | MultiActorDungeon: The environment.
     """
     environment_map = {"single": DungeonTFEnvironment, "multi": MultiActorDungeon}
 
     dungeon_environment = environment_map[config["environment"]["environment"]](
-        dungeon=LevelLoader().loadLevel(config["environment"]["dungeon"])
+        dungeon=LevelLoader().loadLevel(config["environment"]["dungeon"]),
+        rewards=config["environment"]["rewards"],
+        seed=derive_seed(config["environment"]["seed"], ENVIRONMENT_STREAM, 0)
     )
 
     if config["environment"]["disable_action_masking"]:
         dungeon_environment.disable_action_masking()
 
+    return dungeon_environment
+
+def train(config: dict):
+    """Trains a RL model.
+
+    Args:
+        config (dict): The training configuration.
+    """
+    dungeon_environment = createDungeonEnvironment(config)
+
     environment = Environment.create(
         environment=dungeon_environment,
         max_episode_timesteps=config["environment"]["max_timesteps"],
@@ -43,7 +60,9 @@ def train(config: dict):
         max_episode_timesteps=config["runner"]["max_timesteps"]
     )
 
+    start = perf_counter()
     runner.run(num_episodes=config["runner"]["episodes"])
+    reportThroughput(sum(runner.episode_timesteps), perf_counter() - start)
 
     agent.save(directory=config["output"]+'/saved-model', format='saved-model')
     agent.save(directory=config["output"]+'/numpy-model', format='numpy')
@@ -52,6 +71,62 @@ def train(config: dict):
     agent.close()
     environment.close()
 
+def reportThroughput(timesteps: int, seconds: float):
+    """Prints the training throughput. Used by the Tensorforce and the Stable-Baselines3 training drivers
+    so that both are measured the same way (environment timesteps during the training loop).
+
+    Args:
+        timesteps (int): Number of environment timesteps.
+        seconds (float): Duration of the training loop.
+    """
+    print("Trained %d timesteps in %.1f s (%.1f steps/s)" % (timesteps, seconds, timesteps / seconds))
+
+def checkReproducibility(config: dict, num_steps: int, fileName="reproducibility.json"):
+    """Records a random rollout in the configured environment, replays its actions in a second environment
+    with the same seed and asserts identical trajectories. The recording is saved as a JSON file that can be
+    replayed by later runs (see replayRecording).
+
+    Args:
+        config (dict): The training configuration.
+        num_steps (int): Number of steps to record.
+        fileName (str, optional): Name of the recording file. Defaults to "reproducibility.json".
+
+    Raises:
+        AssertionError: Raised if the trajectories differ
+    """
+    assert config["environment"]["seed"] is not None, "Reproducibility check requires a seed."
+
+    recording = record_rollout(
+        createDungeonEnvironment(config), num_steps, seed=derive_seed(config["environment"]["seed"], ACTION_STREAM)
+    )
+    recording["environment"] = config["environment"]
+    with open(join(config["output"], fileName), 'w') as recordingFile:
+        json.dump(recording, recordingFile)
+
+    replay_rollout(createDungeonEnvironment(config), recording)
+    print("Replayed %d steps, trajectories are identical" % len(recording["actions"]))
+
+def replayRecording(config: dict, path: str):
+    """Replays a recording saved by checkReproducibility (e.g. by another version of the code or on another
+    machine) in the configured environment and asserts identical trajectories.
+
+    Args:
+        config (dict): The training configuration.
+        path (str): Path of the recording file.
+
+    Raises:
+        AssertionError: Raised if the environment settings differ from the recorded ones or the trajectories differ
+    """
+    with open(path) as recordingFile:
+        recording = json.load(recordingFile)
+
+    for key in ("environment", "rewards", "disable_action_masking", "seed"):
+        assert recording["environment"][key] == config["environment"][key], \
+            "Recording was created with %s=%s but the configuration has %s" % (key, recording["environment"][key], config["environment"][key])
+
+    replay_rollout(createDungeonEnvironment(config), recording)
+    print("Replayed %d steps, trajectories are identical" % len(recording["actions"]))
+
 def checkPositive(value):
     """Checks if input values are positive integers
 
@@ -86,7 +161,14 @@ def setupArgumentParser():
     parser.add_argument("-e", "--episodes", type=checkPositive, default=100, help="")
     parser.add_argument("-s", "--summarize", action='store_true', help="")
     parser.add_argument("-r", "--reward_shaping", default=None, help="")
+    parser.add_argument("--rewards", default=None, help="JSON file with a list of reward declarations")
     parser.add_argument("--disable_action_masking", action='store_true', help="")
+    parser.add_argument("--seed", type=int, default=None, help="Master seed for environment and agent")
+    reproducibility = parser.add_mutually_exclusive_group()
+    reproducibility.add_argument("--check_reproducibility", type=checkPositive, default=None, metavar="STEPS",
+                                 help="Record a rollout of STEPS random actions, replay it and exit without training")
+    reproducibility.add_argument("--replay", default=None, metavar="FILE",
+                                 help="Replay a recording of --check_reproducibility and exit without training")
 
     return parser
 
@@ -102,6 +184,11 @@ def assembleConfiguration(args):
     if args.environment == "multi":
         assert args.reward_shaping == None, "Multi-actor-environment is currently not compatible with the reward shaping option."
 
+    rewards = None
+    if args.rewards:
+        with open(args.rewards) as rewardsFile:
+            rewards = json.load(rewardsFile)
+
     with open(args.agent) as agentFile:
         agent = json.load(agentFile)
         if args.summarize:
@@ -109,6 +196,8 @@ def assembleConfiguration(args):
                 "directory": join(args.out,"summary"),
                 "summaries": ['entropy', 'loss', 'reward', 'update-norm']
             }
+        if args.seed is not None:
+            agent["config"] = dict(agent.get("config", {}), seed=derive_seed(args.seed, AGENT_STREAM))
 
         config = {
             "environment": {
@@ -116,7 +205,9 @@ def assembleConfiguration(args):
                 "dungeon": abspath(args.dungeon),
                 "max_timesteps": args.max_timesteps,
                 "reward_shaping": args.reward_shaping,
-                "disable_action_masking": args.disable_action_masking
+                "rewards": rewards,
+                "disable_action_masking": args.disable_action_masking,
+                "seed": args.seed
             },
             "agent": agent,
             "runner": {
@@ -143,6 +234,13 @@ def saveConfiguration(config, fileName="config.json"):
 
 if __name__ == '__main__':
     parser = setupArgumentParser()
-    config = assembleConfiguration(parser.parse_args())
-    saveConfiguration(config)
-    train(config)
+    args = parser.parse_args()
+    config = assembleConfiguration(args)
+    if args.replay:
+        replayRecording(config, args.replay)
+    else:
+        saveConfiguration(config)
+        if args.check_reproducibility:
+            checkReproducibility(config, args.check_reproducibility)
+        else:
+            train(config)
@@ -0,0 +1,5 @@
+import sys
+from os.path import abspath, dirname, join
+
+# The modules are imported by name from the source directory (as when running the scripts from there)
+sys.path.insert(0, join(dirname(abspath(__file__)), "..", "src"))
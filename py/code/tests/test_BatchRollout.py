@@ -0,0 +1,81 @@
+import numpy as np
+from BatchRollout import rollout_batch
+from Position import Position
+
+class CorridorEnvironment:
+    """Horizontal corridor x in [0, length) with the goal at the east end. Observations are written into
+    buffers that are shared between calls, so the rollout must copy them."""
+
+    def __init__(self, length: int):
+        self.length = length
+        self._observation = np.empty(2, dtype=np.float32)
+        self._action_mask = np.empty(4, dtype=bool)
+
+    def set_state(self, state: Position):
+        self._internal_state = state
+        return self._states()
+
+    def get_state(self):
+        return self._internal_state
+
+    def execute(self, actions):
+        x = self._internal_state.x + (1 if actions == 3 else -1 if actions == 2 else 0)
+        if 0 <= x < self.length:
+            self._internal_state = Position(x, 0)
+        terminal = self._internal_state.x == self.length - 1
+        return self._states(), terminal, float(terminal)
+
+    def _states(self):
+        self._observation[:] = (self._internal_state.x, self._internal_state.y)
+        self._action_mask[:] = (False, False, self._internal_state.x > 0, self._internal_state.x < self.length - 1)
+        return dict(state=self._observation, action_mask=self._action_mask)
+
+class EastAgent:
+    """Always moves east and records the batches it receives."""
+
+    def __init__(self, internals=None):
+        self.internals = internals or {}
+        self.calls = []
+
+    def initial_internals(self):
+        return self.internals
+
+    def act(self, states, internals, independent, deterministic):
+        self.calls.append(({name: value.copy() for name, value in states.items()}, internals))
+        return np.full(len(states["state"]), 3), internals
+
+def test_batch_rows_match_their_own_start_positions():
+    agent = EastAgent()
+    starts = [Position(x, 0) for x in (0, 4, 7)]
+
+    success, steps = rollout_batch(agent, CorridorEnvironment(10), starts, max_timesteps=20)
+
+    first_states, _ = agent.calls[0]
+    np.testing.assert_array_equal(first_states["state"], [[0, 0], [4, 0], [7, 0]])
+    np.testing.assert_array_equal(first_states["action_mask"], [
+        [False, False, False, True], [False, False, True, True], [False, False, True, True]
+    ])
+    np.testing.assert_array_equal(success, [True, True, True])
+    np.testing.assert_array_equal(steps, [9, 5, 2])
+
+def test_finished_episodes_leave_the_batch():
+    agent = EastAgent()
+
+    rollout_batch(agent, CorridorEnvironment(10), [Position(0, 0), Position(7, 0)], max_timesteps=20)
+
+    np.testing.assert_array_equal(agent.calls[2][0]["state"], [[2, 0]])
+    assert len(agent.calls) == 9
+
+def test_internals_are_stacked_per_active_episode():
+    agent = EastAgent(internals=dict(policy=dict(rnn=np.zeros(3, dtype=np.float32))))
+
+    rollout_batch(agent, CorridorEnvironment(10), [Position(0, 0), Position(5, 0)], max_timesteps=20)
+
+    assert agent.calls[0][1]["policy"]["rnn"].shape == (2, 3)
+    assert agent.calls[-1][1]["policy"]["rnn"].shape == (1, 3)
+
+def test_episodes_stop_at_timestep_limit():
+    success, steps = rollout_batch(EastAgent(), CorridorEnvironment(10), [Position(0, 0)], max_timesteps=3)
+
+    np.testing.assert_array_equal(success, [False])
+    np.testing.assert_array_equal(steps, [3])
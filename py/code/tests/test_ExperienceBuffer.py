@@ -0,0 +1,100 @@
+import multiprocessing
+import numpy as np
+import pytest
+from ExperienceBuffer import SharedExperienceBuffer, experience_schema
+
+# Specifications as returned by DungeonTFEnvironment and MultiActorDungeon
+SINGLE_ACTOR_SPEC = dict(type=float, shape=(2,)), dict(type=int, num_values=4)
+MULTI_ACTOR_SPEC = dict(type=float, shape=(4,)), dict(type=int, num_values=5)
+
+def write_records(buffer, worker, num_records):
+    # Runs in a spawned process, the buffer is attached by name
+    for step in range(num_records):
+        buffer.write(
+            worker,
+            state=[worker, step],
+            action_mask=[True, False, True, step % 2 == 0],
+            action=step % 4,
+            reward=worker + step / 10,
+            terminal=step == num_records - 1
+        )
+    buffer.close()
+
+def write_steps(buffer, worker, steps):
+    for step in steps:
+        buffer.write(worker, state=[worker, step], action_mask=[True] * 4, action=0, reward=0.0, terminal=0)
+
+@pytest.fixture
+def buffer():
+    with SharedExperienceBuffer(experience_schema(*SINGLE_ACTOR_SPEC), num_workers=2, capacity=4) as buffer:
+        yield buffer
+
+def test_schema_layout():
+    single = experience_schema(*SINGLE_ACTOR_SPEC)
+    multi = experience_schema(*MULTI_ACTOR_SPEC)
+
+    assert single["state"] == ((2,), np.float32) and multi["state"] == ((4,), np.float32)
+    assert single["action_mask"] == ((4,), np.bool_) and multi["action_mask"] == ((5,), np.bool_)
+    for schema in (single, multi):
+        assert schema["action"] == ((), np.int32)
+        assert schema["reward"] == ((), np.float32)
+        assert schema["terminal"] == ((), np.int8)
+
+def test_spawned_workers_write_and_parent_reads_views(buffer):
+    context = multiprocessing.get_context("spawn")
+    workers = [context.Process(target=write_records, args=(buffer, worker, 4)) for worker in range(2)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+        assert worker.exitcode == 0
+
+    for worker in range(2):
+        assert buffer.written(worker) == 4
+        records = buffer.batch(worker, 0, 4)
+        np.testing.assert_array_equal(records["state"], [[worker, step] for step in range(4)])
+        np.testing.assert_array_equal(records["action"], [0, 1, 2, 3])
+        np.testing.assert_allclose(records["reward"], [worker, worker + 0.1, worker + 0.2, worker + 0.3])
+        np.testing.assert_array_equal(records["terminal"], [0, 0, 0, 1])
+        assert not records["state"].flags.owndata
+
+    records = buffer.batch_all(0, 4)
+    assert records["state"].shape == (2, 4, 2)
+    np.testing.assert_array_equal(records["action_mask"][:, :, 3], [[True, False, True, False]] * 2)
+
+def test_write_to_full_slot_fails_until_released(buffer):
+    write_steps(buffer, 0, range(4))
+
+    assert buffer.space(0) == 0
+    with pytest.raises(BufferError):
+        write_steps(buffer, 0, [4])
+
+    buffer.release(0, 2)
+    write_steps(buffer, 0, [4, 5])
+    np.testing.assert_array_equal(buffer.batch(0, 4, 2)["state"], [[0, 4], [0, 5]])
+    assert buffer.space(1) == 4
+
+def test_batch_rejects_unavailable_and_wrapping_records(buffer):
+    write_steps(buffer, 0, range(4))
+    buffer.release(0, 2)
+
+    with pytest.raises(ValueError, match="not available"):
+        buffer.batch(0, 0, 2)
+    with pytest.raises(ValueError, match="not available"):
+        buffer.batch(0, 2, 3)
+
+    write_steps(buffer, 0, [4])
+    with pytest.raises(ValueError, match="wraps around"):
+        buffer.batch(0, 2, 3)
+
+def test_batch_all_requires_records_of_every_worker(buffer):
+    write_steps(buffer, 0, range(2))
+
+    with pytest.raises(ValueError, match="slot 1"):
+        buffer.batch_all(0, 2)
+
+    write_steps(buffer, 1, range(2))
+    np.testing.assert_array_equal(buffer.batch_all(0, 2)["state"], [[[0, 0], [0, 1]], [[1, 0], [1, 1]]])
+
+    buffer.release_all(2)
+    assert buffer.space(0) == buffer.space(1) == 4
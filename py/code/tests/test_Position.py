@@ -0,0 +1,15 @@
+import pickle
+import pytest
+from Position import Position
+
+def test_position_is_immutable():
+    position = Position(1, 2)
+
+    with pytest.raises(AttributeError):
+        position.x = 3
+    assert {position: 1}[Position(1, 2)] == 1
+    assert pickle.loads(pickle.dumps(position)) == position
+
+def test_position_only_equals_positions():
+    assert Position(1, 2) != (1, 2)
+    assert Position(1, 2).__eq__((1, 2)) is NotImplemented
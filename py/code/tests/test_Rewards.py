@@ -0,0 +1,82 @@
+import json
+from math import sqrt
+from os.path import dirname, join
+import numpy as np
+import pytest
+from Rewards import compile_rewards, compile_termination, pursuit_evasion
+
+REWARD_DIRECTORY = join(dirname(__file__), "..", "src", "Configuration", "Reward")
+
+def load_declarations(name):
+    with open(join(REWARD_DIRECTORY, name)) as declarationFile:
+        return json.load(declarationFile)
+
+def per_actor_pursuit_evasion(current_state, next_state):
+    # Reference implementation with one distance computation per actor
+    distance = lambda source, destination: sqrt(pow(destination[0] - source[0], 2) + pow(destination[1] - source[1], 2))
+    sign = lambda x: 1 if x > 0 else (-1 if x < 0 else 0)
+    current_distance = distance(current_state[0], current_state[1])
+    return np.array([
+         sign(distance(next_state[0], current_state[1]) - current_distance),
+        -sign(distance(next_state[1], current_state[0]) - current_distance)
+    ])
+
+def test_pursuit_evasion_matches_per_actor_reference():
+    reward = pursuit_evasion()
+    rng = np.random.default_rng(0)
+    states = rng.integers(-3, 4, size=(200, 2, 2))
+    next_states = states + rng.integers(-1, 2, size=(200, 2, 2))
+
+    for state, next_state in zip(states, next_states):
+        np.testing.assert_array_equal(reward(state, np.zeros(2), next_state), per_actor_pursuit_evasion(state, next_state))
+
+def test_pursuer_is_rewarded_for_closing_in():
+    reward = compile_rewards([dict(type="pursuit_evasion", value=1.0)], num_actors=2)
+    state = np.array([[0, 0], [5, 0]])
+
+    # The evader stays, the pursuer moves one step towards it
+    np.testing.assert_array_equal(reward(state, np.array([4, 2]), np.array([[0, 0], [4, 0]])), [0, 1])
+    # The evader moves away, the pursuer moves away as well
+    np.testing.assert_array_equal(reward(state, np.array([2, 3]), np.array([[-1, 0], [6, 0]])), [1, -1])
+
+def test_batched_inputs_match_single_evaluation():
+    goal = np.array([3, 0])
+    single = compile_rewards(load_declarations("shaped_goal.json"), goal)
+    multi = compile_rewards([dict(type="pursuit_evasion", value=1.0)], num_actors=2)
+    rng = np.random.default_rng(1)
+
+    states, next_states, actions = rng.integers(0, 5, size=(16, 2)), rng.integers(0, 5, size=(16, 2)), rng.integers(0, 5, size=16)
+    batched = single(states, actions, next_states)
+    assert batched.shape == (16,)
+    np.testing.assert_allclose(batched, [single(*arguments) for arguments in zip(states, actions, next_states)])
+
+    states, next_states, actions = rng.integers(0, 5, size=(16, 2, 2)), rng.integers(0, 5, size=(16, 2, 2)), rng.integers(0, 5, size=(16, 2))
+    batched = multi(states, actions, next_states)
+    assert batched.shape == (16, 2)
+    np.testing.assert_allclose(batched, [multi(*arguments) for arguments in zip(states, actions, next_states)])
+
+def test_shaped_goal_terms_are_summed():
+    reward = compile_rewards(load_declarations("shaped_goal.json"), goal=np.array([3, 0]))
+
+    # One step towards the goal
+    assert reward(np.array([1, 0]), 3, np.array([2, 0])) == pytest.approx(0.1 - 0.01)
+    # Running into a wall
+    assert reward(np.array([1, 0]), 0, np.array([1, 0])) == pytest.approx(-0.01 - 0.05)
+    # Standing still is not a collision
+    assert reward(np.array([1, 0]), 4, np.array([1, 0])) == pytest.approx(-0.01)
+    # Reaching the goal
+    assert reward(np.array([2, 0]), 3, np.array([3, 0])) == pytest.approx(1.0 + 0.1 - 0.01)
+
+def test_rewards_that_do_not_fit_the_environment_are_rejected():
+    with pytest.raises(ValueError, match="2 actors"):
+        compile_rewards([dict(type="pursuit_evasion")], goal=np.array([3, 0]))
+    with pytest.raises(ValueError, match="goal position"):
+        compile_rewards([dict(type="distance_delta")], num_actors=2)
+    with pytest.raises(ValueError, match="Unknown reward type"):
+        compile_rewards([dict(type="distance")])
+
+def test_termination_without_goal_keeps_all_actors_active():
+    terminal = compile_termination()(np.zeros((2, 2), np.int32), np.array([0, 4]), np.zeros((2, 2), np.int32))
+
+    assert terminal.dtype == bool
+    np.testing.assert_array_equal(np.arange(2)[~terminal], [0, 1])
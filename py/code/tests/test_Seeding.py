@@ -0,0 +1,53 @@
+import json
+import random
+import numpy as np
+import pytest
+from Seeding import derive_seed, record_rollout, replay_rollout, ENVIRONMENT_STREAM, AGENT_STREAM
+
+class MaskedCorridor:
+    """Tensorforce style corridor x in [0, 5) that fails on masked (impossible) actions."""
+
+    def __init__(self, seed):
+        self._random = random.Random(seed)
+
+    def actions(self):
+        return dict(type=int, num_values=4)
+
+    def num_actors(self):
+        return 1
+
+    def reset(self):
+        self.x = self._random.randrange(4)
+        return self._states()
+
+    def execute(self, actions):
+        assert self._states()["action_mask"][actions], "masked action %d at x=%d" % (actions, self.x)
+        self.x += 1 if actions == 3 else -1
+        return self._states(), self.x == 4, float(self.x == 4)
+
+    def _states(self):
+        return dict(state=np.array([self.x], np.float32), action_mask=np.array([False, False, self.x > 0, self.x < 4]))
+
+def test_derived_seeds_are_distinct_and_stable():
+    seeds = {derive_seed(7, ENVIRONMENT_STREAM, rank) for rank in range(4)} | {derive_seed(7, AGENT_STREAM)}
+
+    assert len(seeds) == 5
+    assert derive_seed(7, ENVIRONMENT_STREAM, 2) == derive_seed(7, ENVIRONMENT_STREAM, 2)
+    assert derive_seed(None, AGENT_STREAM) is None
+
+def test_recorded_rollout_respects_action_mask_and_replays():
+    recording = record_rollout(MaskedCorridor(seed=3), num_steps=100, seed=1)
+
+    assert set(recording["actions"]) <= {2, 3}
+    replay_rollout(MaskedCorridor(seed=3), recording)
+
+def test_replay_detects_different_trajectories():
+    recording = record_rollout(MaskedCorridor(seed=3), num_steps=50, seed=1)
+
+    with pytest.raises(AssertionError):
+        replay_rollout(MaskedCorridor(seed=4), recording)
+
+def test_recording_replays_after_json_round_trip():
+    recording = json.loads(json.dumps(record_rollout(MaskedCorridor(seed=3), num_steps=50, seed=1)))
+
+    replay_rollout(MaskedCorridor(seed=3), recording)
@@ -0,0 +1,33 @@
+import random
+import pytest
+from Position import Position
+from SparseLevel import SparseLevel
+
+def make_level():
+    # Two rooms far apart, the space between them is not allocated
+    positions = [Position(x, y) for x in range(3) for y in range(2)] + [Position(100 + x, -40) for x in range(4)]
+    return SparseLevel(positions, chunk_size=4), positions
+
+def test_accessibility_and_bounds():
+    level, positions = make_level()
+
+    assert all(position in level for position in positions)
+    assert Position(50, 0) not in level
+    assert level.bounds() == (0, -40, 103, 1)
+    assert level.nbytes == 2 * 4 * 4
+
+def test_indexed_access_matches_iteration():
+    level, positions = make_level()
+
+    assert len(level) == len(positions)
+    assert [level.position(index) for index in range(len(level))] == list(level)
+    with pytest.raises(IndexError):
+        level.position(len(level))
+
+def test_random_position_excludes_positions():
+    level = SparseLevel([Position(0, 0), Position(1, 0)])
+    rng = random.Random(0)
+
+    assert {level.random_position(rng, exclude=[Position(0, 0)]) for _ in range(20)} == {Position(1, 0)}
+    with pytest.raises(ValueError):
+        level.random_position(rng, exclude=[Position(0, 0), Position(1, 0)])